@@ -21,8 +21,10 @@
 
 import os
 import json
+import hashlib
 import contextlib
 import collections
+from DNSPublisher import DNSPublisher
 
 class Configuration():
 	def __init__(self, dirname):
@@ -39,6 +41,10 @@ class Configuration():
 	def base_dir(self):
 		return self._dirname
 
+	@property
+	def filename(self):
+		return self._filename
+
 	@property
 	def requests(self):
 		return iter(self._config["requests"])
@@ -48,8 +54,15 @@ class Configuration():
 		return self._config["challenge_dir"]
 
 	@property
-	def account_key(self):
-		return self._config["account_key"]
+	def dns_publisher(self):
+		return self._config.get("dns_publisher")
+
+	@property
+	def accounts(self):
+		if "accounts" in self._config:
+			return self._config["accounts"]
+		else:
+			return [ { "name": "default", "account_key": self._config["account_key"] } ]
 
 	@property
 	def renew_days_before_expiration(self):
@@ -63,10 +76,66 @@ class Configuration():
 	def apache2_config_template_dir(self):
 		return self._config["apache2_config_template_dir"]
 
+	@property
+	def http_requests(self):
+		return (request for request in self.requests if self.challenge_type(request) == "http-01")
+
 	@property
 	def configured(self):
 		return self._config is not None
 
+	def check(self):
+		"""Returns a list of human-readable problems with the configuration."""
+		problems = [ ]
+		accounts = self.accounts
+		account_names = set()
+		if (not isinstance(accounts, list)) or (len(accounts) == 0):
+			problems.append("'accounts' must be a non-empty list.")
+			accounts = [ ]
+		for (aid, account) in enumerate(accounts, 1):
+			if not isinstance(account, dict):
+				problems.append("Account #%d is not an object." % (aid))
+				continue
+			for key in [ "name", "account_key" ]:
+				if key not in account:
+					problems.append("Account #%d has no '%s'." % (aid, key))
+			if "name" in account:
+				if account["name"] in account_names:
+					problems.append("Account name '%s' is used more than once." % (account["name"]))
+				account_names.add(account["name"])
+
+		for request in self.requests:
+			if ("account" in request) and (request["account"] not in account_names):
+				problems.append("Request '%s' is pinned to unknown account '%s'." % (request["name"], request["account"]))
+			challenge_type = self.challenge_type(request)
+			if challenge_type not in [ "http-01", "dns-01" ]:
+				problems.append("Request '%s' uses unsupported challenge type '%s'." % (request["name"], challenge_type))
+			elif (challenge_type == "dns-01") and (self.dns_publisher is None):
+				problems.append("Request '%s' uses the dns-01 challenge, but no 'dns_publisher' is configured." % (request["name"]))
+			if challenge_type != "dns-01":
+				for hostname in request["hostnames"]:
+					if hostname.startswith("*."):
+						problems.append("Request '%s' contains wildcard hostname '%s', which requires the dns-01 challenge." % (request["name"], hostname))
+		if self.dns_publisher is not None:
+			problems += DNSPublisher.check_config(self.dns_publisher)
+		return problems
+
+	def challenge_type(self, request):
+		return request.get("challenge_type", self._config.get("challenge_type", "http-01"))
+
+	def account_for_request(self, request):
+		accounts = self.accounts
+		if "account" in request:
+			for account in accounts:
+				if account["name"] == request["account"]:
+					return account
+			raise KeyError("Request '%s' is pinned to unknown account '%s'." % (request["name"], request["account"]))
+		else:
+			# Deterministic assignment so that a request keeps its account as
+			# long as the list of accounts does not change.
+			digest = hashlib.sha256(request["name"].encode("utf-8")).digest()
+			return accounts[int.from_bytes(digest[:8], byteorder = "big") % len(accounts)]
+
 	def _create_dir(self, dirname):
 		with contextlib.suppress(FileExistsError):
 			os.makedirs(dirname)
@@ -79,7 +148,10 @@ class Configuration():
 		self._create_dir(self._dirname)
 		if self.configured:
 			self._create_dir(self.challenge_dir)
-			self._create_filedir(self.account_key)
+			for account in self.accounts:
+				# Invalid entries are reported by check().
+				if isinstance(account, dict) and ("account_key" in account):
+					self._create_filedir(account["account_key"])
 			self._create_filedir(self.renew_trigger_file)
 			self._create_dir(self.apache2_config_template_dir)
 			for request in self.requests:
@@ -0,0 +1,150 @@
+#	leclient - Let's encrypt frontend tooling and configuration
+#	Copyright (C) 2020-2021 Johannes Bauer
+#
+#	This file is part of leclient.
+#
+#	leclient is free software; you can redistribute it and/or modify
+#	it under the terms of the GNU General Public License as published by
+#	the Free Software Foundation; this program is ONLY licensed under
+#	version 3 of the License, later versions are explicitly excluded.
+#
+#	leclient is distributed in the hope that it will be useful,
+#	but WITHOUT ANY WARRANTY; without even the implied warranty of
+#	MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#	GNU General Public License for more details.
+#
+#	You should have received a copy of the GNU General Public License
+#	along with leclient. If not, see <http://www.gnu.org/licenses/>.
+#
+#	Johannes Bauer <JohannesBauer@gmx.de>
+
+import os
+import time
+import threading
+import subprocess
+
+class DNSPublisher():
+	"""Publishes the TXT records of dns-01 challenges. All records of an order
+	are handed over at once as a list of (record_name, value) tuples so that
+	they can be published in a single batch."""
+	_REGISTERED = { }
+	_REQUIRED_PARAMS = ( )
+
+	def __init__(self, params):
+		self._params = params
+
+	@classmethod
+	def register(cls, publisher_class):
+		cls._REGISTERED[publisher_class._NAME] = publisher_class
+		return publisher_class
+
+	@classmethod
+	def from_config(cls, params):
+		publisher_class = cls._REGISTERED.get(params["type"])
+		if publisher_class is None:
+			raise NotImplementedError("Unknown DNS publisher type: %s" % (params["type"]))
+		return publisher_class(params)
+
+	@classmethod
+	def check_config(cls, params):
+		"""Returns a list of human-readable problems with the publisher
+		configuration."""
+		publisher_class = cls._REGISTERED.get(params.get("type"))
+		if publisher_class is None:
+			return [ "Unknown DNS publisher type '%s', must be one of %s." % (params.get("type"), ", ".join(sorted(cls._REGISTERED))) ]
+		return [ "DNS publisher '%s' requires parameter '%s'." % (publisher_class._NAME, name) for name in publisher_class._REQUIRED_PARAMS if name not in params ]
+
+	def publish(self, records):
+		raise NotImplementedError(self.__class__.__name__)
+
+	def remove(self, records):
+		raise NotImplementedError(self.__class__.__name__)
+
+	def _records_visible(self, records, nameserver):
+		for (record_name, value) in records:
+			output = subprocess.check_output([ "dig", "+short", "@" + nameserver, "TXT", record_name ])
+			values = set(line.strip("\"") for line in output.decode("ascii").split("\n"))
+			if value not in values:
+				return False
+		return True
+
+	def wait_for_propagation(self, records):
+		nameservers = self._params.get("check_nameservers", [ ])
+		if len(nameservers) == 0:
+			time.sleep(self._params.get("propagation_delay", 30))
+			return
+
+		t0 = time.time()
+		timeout = self._params.get("propagation_timeout", 600)
+		for nameserver in nameservers:
+			while not self._records_visible(records, nameserver):
+				if time.time() - t0 > timeout:
+					raise TimeoutError("TXT records not visible at %s after %d seconds." % (nameserver, timeout))
+				time.sleep(5)
+
+@DNSPublisher.register
+class NSUpdateDNSPublisher(DNSPublisher):
+	"""RFC 2136 dynamic update using the 'nsupdate' tool."""
+	_NAME = "nsupdate"
+
+	def _update(self, action, records):
+		commands = [ ]
+		if "server" in self._params:
+			commands.append("server %s" % (self._params["server"]))
+		if "zone" in self._params:
+			commands.append("zone %s" % (self._params["zone"]))
+		ttl = self._params.get("ttl", 60)
+		for (record_name, value) in records:
+			commands.append("update %s %s. %d TXT \"%s\"" % (action, record_name, ttl, value))
+		commands.append("send")
+		commands.append("")
+
+		cmd = [ "nsupdate" ]
+		if "tsig_keyfile" in self._params:
+			cmd += [ "-k", self._params["tsig_keyfile"] ]
+		subprocess.check_call(cmd, input = "\n".join(commands).encode("ascii"))
+
+	def publish(self, records):
+		self._update("add", records)
+
+	def remove(self, records):
+		self._update("delete", records)
+
+@DNSPublisher.register
+class ZoneFileDNSPublisher(DNSPublisher):
+	"""Writes the TXT records into a file that is included by the zone
+	definition of the local name server and runs a reload command
+	afterwards. Records of concurrently running orders are kept together in
+	the same file."""
+	_NAME = "zonefile"
+	_REQUIRED_PARAMS = ( "filename", )
+
+	def __init__(self, params):
+		super().__init__(params)
+		self._lock = threading.Lock()
+		self._records = [ ]
+
+	def _write(self, records):
+		ttl = self._params.get("ttl", 60)
+		tmp_filename = self._params["filename"] + ".tmp"
+		with open(tmp_filename, "w") as f:
+			print("; Generated by leclient, do not edit manually.", file = f)
+			for (record_name, value) in records:
+				print("%s. %d IN TXT \"%s\"" % (record_name, ttl, value), file = f)
+		os.rename(tmp_filename, self._params["filename"])
+		if "reload_cmd" in self._params:
+			subprocess.check_call(self._params["reload_cmd"])
+
+	def publish(self, records):
+		with self._lock:
+			# Only remember the records once they were written successfully;
+			# otherwise the caller never removes them again.
+			new_records = self._records + records
+			self._write(new_records)
+			self._records = new_records
+
+	def remove(self, records):
+		with self._lock:
+			for record in records:
+				self._records.remove(record)
+			self._write(self._records)
@@ -0,0 +1,89 @@
+#	leclient - Let's encrypt frontend tooling and configuration
+#	Copyright (C) 2020-2021 Johannes Bauer
+#
+#	This file is part of leclient.
+#
+#	leclient is free software; you can redistribute it and/or modify
+#	it under the terms of the GNU General Public License as published by
+#	the Free Software Foundation; this program is ONLY licensed under
+#	version 3 of the License, later versions are explicitly excluded.
+#
+#	leclient is distributed in the hope that it will be useful,
+#	but WITHOUT ANY WARRANTY; without even the implied warranty of
+#	MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#	GNU General Public License for more details.
+#
+#	You should have received a copy of the GNU General Public License
+#	along with leclient. If not, see <http://www.gnu.org/licenses/>.
+#
+#	Johannes Bauer <JohannesBauer@gmx.de>
+
+import os
+import struct
+import select
+import ctypes
+import ctypes.util
+
+class InotifyOverflowError(Exception):
+	pass
+
+class Inotify():
+	"""Minimal wrapper around the Linux inotify API that watches directories
+	and reports the full paths of files which were changed inside them.
+	Directories are watched instead of files because files are replaced by
+	renaming them into place."""
+	IN_CLOSE_WRITE = 0x00000008
+	IN_MOVED_FROM = 0x00000040
+	IN_MOVED_TO = 0x00000080
+	IN_CREATE = 0x00000100
+	IN_DELETE = 0x00000200
+	IN_Q_OVERFLOW = 0x00004000
+	DEFAULT_MASK = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+	_EVENT_HEADER = struct.Struct("iIII")
+
+	def __init__(self):
+		self._libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno = True)
+		self._fd = self._libc.inotify_init1(os.O_CLOEXEC)
+		if self._fd < 0:
+			errno = ctypes.get_errno()
+			raise OSError(errno, "inotify_init1: %s" % (os.strerror(errno)))
+		self._watches = { }
+
+	def watch_directory(self, dirname, mask = DEFAULT_MASK):
+		dirname = os.path.realpath(dirname)
+		if dirname in self._watches.values():
+			return
+		wd = self._libc.inotify_add_watch(self._fd, dirname.encode(), mask)
+		if wd < 0:
+			errno = ctypes.get_errno()
+			raise OSError(errno, "inotify_add_watch %s: %s" % (dirname, os.strerror(errno)))
+		self._watches[wd] = dirname
+
+	def read_changed_files(self, timeout = None):
+		(readable, _, _) = select.select([ self._fd ], [ ], [ ], timeout)
+		if len(readable) == 0:
+			return set()
+
+		changed_files = set()
+		data = os.read(self._fd, 65536)
+		offset = 0
+		while offset < len(data):
+			(wd, mask, cookie, name_length) = self._EVENT_HEADER.unpack_from(data, offset)
+			offset += self._EVENT_HEADER.size
+			if mask & self.IN_Q_OVERFLOW:
+				# Events were lost, the caller has to rescan everything.
+				raise InotifyOverflowError("inotify event queue overflowed")
+			name = data[offset : offset + name_length].rstrip(b"\x00").decode()
+			offset += name_length
+			if (wd in self._watches) and (name != ""):
+				changed_files.add(self._watches[wd] + "/" + name)
+		return changed_files
+
+	def close(self):
+		os.close(self._fd)
+
+	def __enter__(self):
+		return self
+
+	def __exit__(self, *args):
+		self.close()
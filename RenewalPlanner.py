@@ -0,0 +1,107 @@
+#	leclient - Let's encrypt frontend tooling and configuration
+#	Copyright (C) 2020-2021 Johannes Bauer
+#
+#	This file is part of leclient.
+#
+#	leclient is free software; you can redistribute it and/or modify
+#	it under the terms of the GNU General Public License as published by
+#	the Free Software Foundation; this program is ONLY licensed under
+#	version 3 of the License, later versions are explicitly excluded.
+#
+#	leclient is distributed in the hope that it will be useful,
+#	but WITHOUT ANY WARRANTY; without even the implied warranty of
+#	MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#	GNU General Public License for more details.
+#
+#	You should have received a copy of the GNU General Public License
+#	along with leclient. If not, see <http://www.gnu.org/licenses/>.
+#
+#	Johannes Bauer <JohannesBauer@gmx.de>
+
+import os
+import sys
+import hashlib
+import datetime
+import subprocess
+from Tools import CertTools
+
+class RenewalPlanner():
+	"""Determines when each certificate is renewed. The renewal window of a
+	certificate starts renew_days_before_expiration days before notAfter and
+	ends at half that time before notAfter. Within the first half of the
+	window, every certificate gets a fixed position derived from its name;
+	certificates which would then be renewed at nearly the same time are
+	pushed apart by min_spacing, using the remainder of their window as
+	slack. All planned times are naive UTC datetimes in whole seconds."""
+	RETRY_DELAY = datetime.timedelta(hours = 1)
+
+	def __init__(self, renew_days_before_expiration, min_spacing = datetime.timedelta(hours = 1)):
+		self._renew_before = datetime.timedelta(days = renew_days_before_expiration)
+		self._min_spacing = min_spacing
+		self._windows = { }
+		self._postponed = { }
+
+	@staticmethod
+	def _ceil_to_second(timestamp):
+		# The systemd timer has a resolution of one second; rounding up ensures
+		# it never fires before the planned time.
+		if timestamp.microsecond == 0:
+			return timestamp
+		return timestamp.replace(microsecond = 0) + datetime.timedelta(seconds = 1)
+
+	@staticmethod
+	def _position(name):
+		digest = hashlib.sha256(name.encode("utf-8")).digest()
+		return int.from_bytes(digest[:8], byteorder = "big") / (1 << 64)
+
+	def _window(self, request):
+		now = datetime.datetime.utcnow()
+		if not os.path.isfile(request["server_crt"]):
+			return (now, now)
+		if CertTools.crt_get_hostnames(request["server_crt"]) != CertTools.csr_get_hostnames(request["server_csr"]):
+			return (now, now)
+		if ("key_rollover" in request) and os.access(request["server_key"], os.R_OK) and (not CertTools.crt_matches_key(request["server_crt"], request["server_key"])):
+			# Key rollover was interrupted between renaming key and certificate.
+			return (now, now)
+		not_after = CertTools.crt_get_not_after(request["server_crt"])
+		return (not_after - self._renew_before, not_after - (self._renew_before / 2))
+
+	def update(self, request):
+		self._postponed.pop(request["name"], None)
+		try:
+			self._windows[request["name"]] = self._window(request)
+		except (subprocess.CalledProcessError, ValueError) as e:
+			# Files may be caught in the middle of being replaced.
+			print("Cannot determine renewal window of %s, retrying later: %s" % (request["name"], e), file = sys.stderr)
+			self.postpone(request["name"])
+
+	def postpone(self, name, retry_time = None):
+		if retry_time is None:
+			retry_time = datetime.datetime.utcnow() + self.RETRY_DELAY
+		self._windows[name] = (retry_time, retry_time)
+		self._postponed[name] = retry_time
+
+	@property
+	def postponements(self):
+		return dict(self._postponed)
+
+	def plan(self):
+		candidates = [ ]
+		for (name, (start, end)) in self._windows.items():
+			candidates.append((start + (end - start) / 2 * self._position(name), name))
+		candidates.sort()
+
+		plan = { }
+		previous = None
+		for (planned, name) in candidates:
+			if (previous is not None) and (planned < previous + self._min_spacing):
+				planned = max(planned, min(previous + self._min_spacing, self._windows[name][1]))
+			plan[name] = self._ceil_to_second(planned)
+			previous = planned if (previous is None) else max(previous, planned)
+		return plan
+
+	def next_wakeup(self):
+		plan = self.plan()
+		if len(plan) == 0:
+			return None
+		return max(min(plan.values()), self._ceil_to_second(datetime.datetime.utcnow() + self.RETRY_DELAY))
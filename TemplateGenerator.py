@@ -26,7 +26,7 @@ import mako.lookup
 class TemplateGenerator():
 	def __init__(self, config):
 		self._config = config
-		self._lookup = mako.lookup.TemplateLookup([ "." ], strict_undefined = True)
+		self._lookup = mako.lookup.TemplateLookup([ os.path.dirname(os.path.realpath(__file__)) ], strict_undefined = True)
 
 	def _render(self, source_name, variables):
 		template = self._lookup.get_template(source_name)
@@ -37,7 +37,7 @@ class TemplateGenerator():
 
 	def render_http(self):
 		hostnames = set()
-		for request in self._config.requests:
+		for request in self._config.http_requests:
 			hostnames |= set(request["hostnames"])
 		hostnames = sorted(hostnames)
 		return self._render("apache_config_template_http.conf", {
@@ -46,8 +46,14 @@ class TemplateGenerator():
 		})
 
 	def render_https(self, request):
+		# Apache only treats wildcards as such in ServerAlias, so pick a
+		# non-wildcard name as ServerName if there is one.
+		hostnames = request["hostnames"]
+		server_name = next((hostname for hostname in hostnames if not hostname.startswith("*.")), hostnames[0])
 		return self._render("apache_config_template_https.conf", {
-			"hostnames":		request["hostnames"],
+			"server_name":		server_name,
+			"server_aliases":	[ hostname for hostname in hostnames if hostname != server_name ],
+			"admin_domain":		server_name[2:] if server_name.startswith("*.") else server_name,
 			"cert_filename":	request["server_crt"],
 			"chain_filename":	request["server_crt_chain"],
 			"key_filename":		request["server_key"],
@@ -58,5 +64,15 @@ class TemplateGenerator():
 			"renew_executable":	executable,
 		})
 
+	def render_systemd_daemon_service(self, executable):
+		return self._render("systemd-daemon.service", {
+			"renew_executable":	executable,
+		})
+
 	def render_systemd_timer(self):
 		return self._render("systemd.timer", { })
+
+	def render_systemd_timer_schedule(self, next_wakeup):
+		return self._render("systemd-timer-schedule.conf", {
+			"next_wakeup":		None if (next_wakeup is None) else next_wakeup.strftime("%Y-%m-%d %H:%M:%S UTC"),
+		})
@@ -56,6 +56,15 @@ class CertTools():
 	MONTHS = { name: monthno for (monthno, name) in enumerate([ "jan", "feb", "mar", "apr", "may", "jun", "jul", "aug", "sep", "oct", "nov", "dec" ], 1) }
 	CERT_REGEX = re.compile("^-----BEGIN CERTIFICATE-----.+?-----END CERTIFICATE-----$", flags = re.MULTILINE | re.DOTALL)
 
+	@classmethod
+	def create_private_key(cls, keytype, param, filename):
+		if keytype == "rsa":
+			subprocess.check_call([ "openssl", "genrsa", "-out", filename, str(param) ], stderr = subprocess.DEVNULL)
+		elif keytype == "ecc":
+			subprocess.check_call([ "openssl", "ecparam", "-out", filename, "-name", str(param), "-genkey" ], stderr = subprocess.DEVNULL)
+		else:
+			raise NotImplementedError(keytype)
+
 	@classmethod
 	def create_csr(cls, hostnames, csr_filename, key_filename):
 		with tempfile.NamedTemporaryFile(prefix = "openssl_config_", suffix = ".conf", mode = "w") as f:
@@ -82,21 +91,28 @@ class CertTools():
 			subprocess.check_call(cmd)
 
 	@classmethod
-	def crt_expires_in_less_than_days(cls, crt_filename, days):
+	def crt_get_not_after(cls, crt_filename):
 		not_after = subprocess.check_output([ "openssl", "x509", "-in", crt_filename, "-noout", "-enddate" ])
 		not_after = not_after.decode("ascii").rstrip("\r\n")
 		match = cls.NOT_AFTER_REGEX.fullmatch(not_after)
+		if match is None:
+			raise ValueError("Cannot parse expiry date of %s: %s" % (crt_filename, not_after))
 		match = match.groupdict()
 		match["month"] = cls.MONTHS[match["month"].lower()]
-		expiry_date_utc = datetime.datetime(int(match["year"]), match["month"], int(match["day"]), int(match["hour"]), int(match["minute"]), int(match["second"]))
-		now_utc = datetime.datetime.utcnow()
-		remaining_days_valid = (expiry_date_utc - now_utc).total_seconds() / 86400
-		return remaining_days_valid < days
+		return datetime.datetime(int(match["year"]), match["month"], int(match["day"]), int(match["hour"]), int(match["minute"]), int(match["second"]))
+
+	@classmethod
+	def crt_matches_key(cls, crt_filename, key_filename):
+		crt_pubkey = subprocess.check_output([ "openssl", "x509", "-in", crt_filename, "-noout", "-pubkey" ])
+		key_pubkey = subprocess.check_output([ "openssl", "pkey", "-in", key_filename, "-pubout" ], stderr = subprocess.DEVNULL)
+		return crt_pubkey == key_pubkey
 
 	@classmethod
 	def _rawtext_get_dnsnames(cls, raw_text):
 		text = raw_text.decode()
 		match = cls.HOSTNAME_REGEX.search(text)
+		if match is None:
+			raise ValueError("No subject alternative names found.")
 		match = match.groupdict()
 		names = match["names"].strip()
 		split_names = cls.DNSNAME_SPLITTER.split(names)
@@ -13,7 +13,7 @@ LOGGER = logging.getLogger(__name__)
 LOGGER.addHandler(logging.StreamHandler())
 LOGGER.setLevel(logging.INFO)
 
-def get_crt(account_key, csr, acme_dir, log=LOGGER, CA=DEFAULT_CA, disable_check=False, directory_url=DEFAULT_DIRECTORY_URL, contact=None):
+def get_crt(account_key, csr, acme_dir, log=LOGGER, CA=DEFAULT_CA, disable_check=False, directory_url=DEFAULT_DIRECTORY_URL, contact=None, dns_publisher=None):
     directory, acct_headers, alg, jwk = None, None, None, None # global variables
 
     # helper functions - base64 encode for jose spec
@@ -70,6 +70,71 @@ def get_crt(account_key, csr, acme_dir, log=LOGGER, CA=DEFAULT_CA, disable_check
             result, _, _ = _send_signed_request(url, None, err_msg)
         return result
 
+    # helper function - complete http-01 challenges one by one
+    def _complete_http_challenges(auth_urls):
+        for auth_url in auth_urls:
+            authorization, _, _ = _send_signed_request(auth_url, None, "Error getting challenges")
+            domain = authorization['identifier']['value']
+            log.info("Verifying {0}...".format(domain))
+
+            # find the http-01 challenge and write the challenge file
+            challenge = [c for c in authorization['challenges'] if c['type'] == "http-01"][0]
+            token = re.sub(r"[^A-Za-z0-9_\-]", "_", challenge['token'])
+            keyauthorization = "{0}.{1}".format(token, thumbprint)
+            wellknown_path = os.path.join(acme_dir, token)
+            with open(wellknown_path, "w") as wellknown_file:
+                wellknown_file.write(keyauthorization)
+
+            # check that the file is in place
+            try:
+                wellknown_url = "http://{0}/.well-known/acme-challenge/{1}".format(domain, token)
+                assert (disable_check or _do_request(wellknown_url)[0] == keyauthorization)
+            except (AssertionError, ValueError) as e:
+                raise ValueError("Wrote file to {0}, but couldn't download {1}: {2}".format(wellknown_path, wellknown_url, e))
+
+            # say the challenge is done
+            _send_signed_request(challenge['url'], {}, "Error submitting challenges: {0}".format(domain))
+            authorization = _poll_until_not(auth_url, ["pending"], "Error checking challenge status for {0}".format(domain))
+            if authorization['status'] != "valid":
+                raise ValueError("Challenge did not pass for {0}: {1}".format(domain, authorization))
+            os.remove(wellknown_path)
+            log.info("{0} verified!".format(domain))
+
+    # helper function - complete dns-01 challenges, publishing all TXT records in one batch
+    def _complete_dns_challenges(auth_urls):
+        pending = []
+        for auth_url in auth_urls:
+            authorization, _, _ = _send_signed_request(auth_url, None, "Error getting challenges")
+            domain = authorization['identifier']['value']
+            if authorization['status'] == "valid":
+                log.info("{0} already verified!".format(domain))
+                continue
+            challenge = [c for c in authorization['challenges'] if c['type'] == "dns-01"][0]
+            keyauthorization = "{0}.{1}".format(challenge['token'], thumbprint)
+            txt_value = _b64(hashlib.sha256(keyauthorization.encode('utf8')).digest())
+            pending.append((auth_url, domain, challenge, ("_acme-challenge.{0}".format(domain), txt_value)))
+        if len(pending) == 0:
+            return
+
+        records = [record for (_, _, _, record) in pending]
+        log.info("Publishing {0} TXT record(s)...".format(len(records)))
+        dns_publisher.publish(records)
+        try:
+            if not disable_check:
+                log.info("Waiting for DNS propagation...")
+                dns_publisher.wait_for_propagation(records)
+
+            # say all challenges are done, then wait for all of them
+            for (_, domain, challenge, _) in pending:
+                _send_signed_request(challenge['url'], {}, "Error submitting challenges: {0}".format(domain))
+            for (auth_url, domain, _, _) in pending:
+                authorization = _poll_until_not(auth_url, ["pending"], "Error checking challenge status for {0}".format(domain))
+                if authorization['status'] != "valid":
+                    raise ValueError("Challenge did not pass for {0}: {1}".format(domain, authorization))
+                log.info("{0} verified!".format(domain))
+        finally:
+            dns_publisher.remove(records)
+
     # parse account key to get public key
     log.info("Parsing account key...")
     out = _cmd(["openssl", "rsa", "-in", account_key, "-noout", "-text"], err_msg="OpenSSL Error")
@@ -122,33 +187,10 @@ def get_crt(account_key, csr, acme_dir, log=LOGGER, CA=DEFAULT_CA, disable_check
     log.info("Order created!")
 
     # get the authorizations that need to be completed
-    for auth_url in order['authorizations']:
-        authorization, _, _ = _send_signed_request(auth_url, None, "Error getting challenges")
-        domain = authorization['identifier']['value']
-        log.info("Verifying {0}...".format(domain))
-
-        # find the http-01 challenge and write the challenge file
-        challenge = [c for c in authorization['challenges'] if c['type'] == "http-01"][0]
-        token = re.sub(r"[^A-Za-z0-9_\-]", "_", challenge['token'])
-        keyauthorization = "{0}.{1}".format(token, thumbprint)
-        wellknown_path = os.path.join(acme_dir, token)
-        with open(wellknown_path, "w") as wellknown_file:
-            wellknown_file.write(keyauthorization)
-
-        # check that the file is in place
-        try:
-            wellknown_url = "http://{0}/.well-known/acme-challenge/{1}".format(domain, token)
-            assert (disable_check or _do_request(wellknown_url)[0] == keyauthorization)
-        except (AssertionError, ValueError) as e:
-            raise ValueError("Wrote file to {0}, but couldn't download {1}: {2}".format(wellknown_path, wellknown_url, e))
-
-        # say the challenge is done
-        _send_signed_request(challenge['url'], {}, "Error submitting challenges: {0}".format(domain))
-        authorization = _poll_until_not(auth_url, ["pending"], "Error checking challenge status for {0}".format(domain))
-        if authorization['status'] != "valid":
-            raise ValueError("Challenge did not pass for {0}: {1}".format(domain, authorization))
-        os.remove(wellknown_path)
-        log.info("{0} verified!".format(domain))
+    if dns_publisher is not None:
+        _complete_dns_challenges(order['authorizations'])
+    else:
+        _complete_http_challenges(order['authorizations'])
 
     # finalize the order with the csr
     log.info("Signing certificate...")